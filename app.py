@@ -1,46 +1,229 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, render_template, request, session, redirect, url_for, flash, g, stream_with_context
+from flask.json.provider import JSONProvider
+import functools
 from functools import wraps
 import os
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 import json
+import atexit
 import logging
+import numpy as np
+import orjson
+import time
+from cachetools import TTLCache
 from werkzeug.exceptions import RequestEntityTooLarge
 
 # Import our custom modules
-from models.ml_models import FakeNewsDetector
 from services.facebook_service import FacebookService
 from services.factcheck_service import FactCheckService
-from services.firebase_service import FirebaseService
-from utils.preprocessor import TextPreprocessor
-from utils.credibility_scorer import CredibilityScorer
+from services.firebase_service import FirebaseService, get_firebase_service as firebase_singleton
 from utils.analysis_engine import NewsAnalysisEngine
+from utils.stats_kernels import reduce_user_stats, VERDICT_CODES, TYPE_CODES
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson so request.get_json() and
+    jsonify-style dumps both go through the C encoder"""
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
 
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'your-secret-key-here')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Static assets carry an mtime-derived ?v= fingerprint (added to every
+# static url_for below), so clients can cache them for a year and the URL
+# changes whenever a deploy touches the file
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+@functools.lru_cache(maxsize=None)
+def _static_file_version(filename):
+    try:
+        return int(os.stat(os.path.join(app.static_folder, filename)).st_mtime)
+    except OSError:
+        return 0
+
+@app.url_defaults
+def _version_static_urls(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        values.setdefault('v', _static_file_version(values['filename']))
+app.json = ORJSONProvider(app)
 
-# Initialize services
+# Compress template-heavy responses (index, trends, dashboard) at the edge
+# of the app; brotli/gzip at level 4 trades negligible CPU for a 3-5x
+# smaller payload on the wire
 try:
-    firebase_service = FirebaseService()
-    facebook_service = FacebookService()
-    factcheck_service = FactCheckService()
-    text_preprocessor = TextPreprocessor()
-    fake_news_detector = FakeNewsDetector()
-    credibility_scorer = CredibilityScorer()
-    
-    # Initialize analysis engine (it creates its own components internally)
-    analysis_engine = NewsAnalysisEngine()
-    
-    logger.info("All services initialized successfully")
-except Exception as e:
-    logger.error(f"Error initializing services: {str(e)}")
-    # Initialize with None for graceful degradation
-    analysis_engine = None
+    from flask_compress import Compress
+    app.config['COMPRESS_ALGORITHM'] = 'br,gzip'
+    app.config['COMPRESS_LEVEL'] = 4
+    app.config['COMPRESS_MIN_SIZE'] = 1024
+    Compress(app)
+except ImportError:
+    logging.getLogger(__name__).warning(
+        "flask-compress not installed, responses will be sent uncompressed"
+    )
+
+# Compiled Jinja templates are cached on disk so each worker (and each
+# restart) reuses the bytecode instead of re-parsing the template sources.
+# auto_reload stays on in debug so template edits show up immediately.
+try:
+    from jinja2 import FileSystemBytecodeCache
+    _jinja_cache_dir = os.environ.get('JINJA_CACHE_DIR', '/tmp/jinja_cache')
+    os.makedirs(_jinja_cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=_jinja_cache_dir)
+    if os.environ.get('FLASK_DEBUG', '').lower() not in ('1', 'true', 'yes'):
+        app.jinja_env.auto_reload = False
+except OSError as e:
+    logging.getLogger(__name__).warning(f"Jinja bytecode cache disabled: {e}")
+
+# Server-side sessions in Redis when available: the user profile is stashed
+# in the session at login, so get_current_user becomes a sub-ms local lookup
+# instead of a Firestore read on every request. Falls back to Flask's
+# signed-cookie sessions when Redis isn't configured.
+# Only when REDIS_URL is explicitly set: redis.from_url is lazy, so a
+# default localhost URL would pass this block and then fail on every
+# session open once requests arrive. The ping() forces the connection
+# attempt here, where the fallback can still engage.
+if os.environ.get('REDIS_URL'):
+    try:
+        import redis
+        from flask_session import Session
+        session_redis = redis.from_url(os.environ['REDIS_URL'])
+        session_redis.ping()
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = session_redis
+        Session(app)
+    except Exception as e:
+        logging.getLogger(__name__).warning(
+            f"Redis session store unavailable, using signed-cookie sessions: {e}"
+        )
+
+# Session-cached profiles are refreshed from Firestore at most this often
+PROFILE_REFRESH_SECONDS = 3600
+
+# Configure logging: application threads enqueue records and a background
+# listener thread does the actual stderr writes, so a burst of service
+# errors never serializes request handling behind synchronous flushes
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_log_queue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter(
+    '%(asctime)s %(levelname)s %(name)s: %(message)s'
+))
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener = None
+
+def start_log_listener():
+    """Start the log drain thread for this process.
+
+    Threads don't survive fork, so with preload_app the listener started
+    at import lives only in the gunicorn master; each worker must call
+    this again from post_fork or its records queue up and are never
+    written.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    _log_listener = QueueListener(_log_queue, _stream_handler,
+                                  respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+start_log_listener()
+logger = logging.getLogger(__name__)
+
+# Heavy service clients are created lazily on first use so light routes
+# (login, logout, health checks, static pages) and worker cold starts never
+# pay for Firebase/ML initialization they don't touch
+@functools.cache
+def get_firebase_service():
+    return firebase_singleton()
+
+@functools.cache
+def get_facebook_service():
+    return FacebookService()
+
+@functools.cache
+def get_factcheck_service():
+    return FactCheckService()
+
+@functools.cache
+def get_analysis_engine():
+    """Analysis engine singleton (creates its own components internally)"""
+    try:
+        return NewsAnalysisEngine()
+    except Exception as e:
+        logger.error(f"Error initializing analysis engine: {str(e)}")
+        # Return None for graceful degradation
+        return None
+
+def _service_available(getter):
+    """Check whether a lazily-created service can be (or was) initialized"""
+    try:
+        return getter() is not None
+    except Exception:
+        return False
+
+# Short-lived cache for aggregate Firebase stats. These are system-wide
+# numbers that change on a minute scale at best, so serving them from memory
+# for a couple of minutes removes the Firestore aggregation queries from the
+# homepage and trends hot paths.
+_stats_cache = TTLCache(maxsize=128, ttl=120)
+_stats_cache_lock = threading.Lock()
+
+# Shared pool for fanning out independent Firebase reads. The calls in the
+# trends routes are all network I/O, so dispatching them together makes the
+# route latency max(slowest call) instead of the sum.
+_io_pool = ThreadPoolExecutor(max_workers=8)
+
+def fetch_firebase_parallel(calls):
+    """Run several (method_name, kwargs) Firebase calls concurrently.
+
+    Returns a dict keyed by the label of each call. Individual failures are
+    logged and reported as None so one slow/broken metric doesn't take down
+    the whole page.
+    """
+    futures = {
+        label: _io_pool.submit(cached_firebase_call, method_name, **kwargs)
+        for label, (method_name, kwargs) in calls.items()
+    }
+
+    results = {}
+    for label, future in futures.items():
+        try:
+            results[label] = future.result()
+        except Exception as e:
+            logger.error(f"Error fetching {label}: {str(e)}")
+            results[label] = None
+    return results
+
+def cached_firebase_call(method_name, *args, **kwargs):
+    """Call a FirebaseService method, caching the result for the TTL window"""
+    key = (method_name, args, tuple(sorted(kwargs.items())))
+    with _stats_cache_lock:
+        if key in _stats_cache:
+            return _stats_cache[key]
+
+    result = getattr(get_firebase_service(), method_name)(*args, **kwargs)
+
+    with _stats_cache_lock:
+        _stats_cache[key] = result
+    return result
+
+def ojson(obj, status=200):
+    """Build a JSON response with orjson's C encoder instead of jsonify"""
+    return app.response_class(
+        orjson.dumps(obj, default=str),
+        status=status,
+        mimetype='application/json'
+    )
 
 # Authentication decorator
 def login_required(f):
@@ -51,15 +234,36 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-# Helper function to get current user
+# Helper function to get current user (memoized on flask.g so the Firestore
+# profile read happens at most once per request, even though both the context
+# processor and the route handlers call this)
 def get_current_user():
+    if 'current_user' in g:
+        return g.current_user
+
+    current_user = None
     if 'user_id' in session:
-        try:
-            return firebase_service.get_user_profile(session['user_id'])
-        except Exception as e:
-            logger.error(f"Error getting user profile: {str(e)}")
-            session.clear()
-    return None
+        # Serve the profile stashed in the session at login; only go back
+        # to Firestore once the periodic refresh window has elapsed
+        profile = session.get('profile')
+        if profile and time.time() - session.get('profile_at', 0) < PROFILE_REFRESH_SECONDS:
+            current_user = profile
+        else:
+            try:
+                current_user = get_firebase_service().get_user_profile(session['user_id'])
+                if current_user:
+                    session['profile'] = current_user
+                    session['profile_at'] = time.time()
+            except Exception as e:
+                logger.error(f"Error getting user profile: {str(e)}")
+                session.clear()
+
+    g.current_user = current_user
+    return current_user
+
+@app.teardown_request
+def clear_current_user(exception=None):
+    g.pop('current_user', None)
 
 # Error handlers
 @app.errorhandler(404)
@@ -76,10 +280,20 @@ def internal_error(error):
 
 @app.errorhandler(RequestEntityTooLarge)
 def too_large(e):
-    return jsonify({
+    return ojson({
         'success': False,
         'error': 'File too large. Maximum size is 16MB.'
-    }), 413
+    }, 413)
+
+# One timestamp per request: handlers that need "now" (auth, export,
+# health) read it from g instead of each taking their own clock reading
+@app.before_request
+def set_request_timestamp():
+    # Timezone-aware: naive utcnow() would make .timestamp() interpret
+    # the value as local time, skewing epoch comparisons (e.g. the weekly
+    # created_at_ts cutoff) by the host's UTC offset
+    g.now = datetime.now(timezone.utc)
+    g.now_iso = g.now.isoformat()
 
 # Context processor to make current_user available to all templates
 @app.context_processor
@@ -90,6 +304,7 @@ def inject_user():
 @app.route('/')
 def index():
     """Home page with dashboard overview"""
+    analysis_engine = get_analysis_engine()
     try:
         # Get system statistics
         system_stats = {
@@ -109,7 +324,7 @@ def index():
                     current_user['uid'], limit=5
                 )
                 # Get system stats from Firebase
-                system_stats = firebase_service.get_system_stats()
+                system_stats = cached_firebase_call('get_system_stats')
             except Exception as e:
                 logger.error(f"Error getting user data: {str(e)}")
         
@@ -127,9 +342,9 @@ def index():
         
         if analysis_engine:
             try:
-                trends_data = firebase_service.get_misinformation_trends(days=7)
+                trends_data = cached_firebase_call('get_misinformation_trends', days=7)
                 # Try to get real trending stats from Firebase
-                real_trending_stats = firebase_service.get_trending_stats()
+                real_trending_stats = cached_firebase_call('get_trending_stats')
                 if real_trending_stats:
                     trending_stats.update(real_trending_stats)
             except Exception as e:
@@ -170,6 +385,7 @@ def login():
 @login_required
 def user_dashboard():
     """User dashboard page"""
+    analysis_engine = get_analysis_engine()
     try:
         current_user = get_current_user()
         if not current_user:
@@ -198,34 +414,116 @@ def user_dashboard():
             try:
                 user_news_verifications = analysis_engine.get_user_analysis_history(current_user['uid'])
                 recent_news_verifications = user_news_verifications[:5] if user_news_verifications else []
-                
-                # Calculate user statistics
-                if user_news_verifications:
-                    user_stats['total_news_verifications'] = len(user_news_verifications)
-                    
+
+                week_ago_ts = (g.now - timedelta(days=7)).timestamp()
+                uid = current_user['uid']
+
+                # Fast path: the stats rollup document maintained at write
+                # time holds every counter the dashboard needs in one read
+                stats_doc = get_firebase_service().get_user_stats(uid)
+                if stats_doc and stats_doc.get('total'):
+                    total = stats_doc['total']
+                    user_stats['total_news_verifications'] = total
+
+                    for content_type in TYPE_CODES:
+                        content_stats[content_type] = stats_doc.get(f'type_{content_type}', 0)
+
+                    fake_count = stats_doc.get('fake', 0)
+                    user_stats['fake_detected'] = fake_count
+                    user_stats['fake_percentage'] = round((fake_count / total) * 100, 1)
+
+                    verified_count = stats_doc.get('real', 0)
+                    user_stats['verified_news'] = verified_count
+                    user_stats['verified_percentage'] = round((verified_count / total) * 100, 1)
+
+                    user_stats['avg_score'] = round(stats_doc.get('score_sum', 0.0) / total, 1)
+                    user_stats['news_verifications_this_week'] = sum(
+                        stats_doc.get(f"day_{(g.now - timedelta(days=offset)).strftime('%Y%m%d')}", 0)
+                        for offset in range(7)
+                    )
+
+                    return render_template('user_dashboard.html',
+                                         current_user=current_user,
+                                         user_stats=user_stats,
+                                         user_news_verifications=user_news_verifications,
+                                         recent_news_verifications=recent_news_verifications,
+                                         content_stats=content_stats,
+                                         user_topics=user_topics)
+
+                # Rollup missing (pre-existing users): fall back to
+                # server-side aggregation queries over the history
+                count_futures = {
+                    'total': _io_pool.submit(get_firebase_service().count_user_verifications, uid),
+                    'fake': _io_pool.submit(get_firebase_service().count_user_verifications, uid, verdict='FAKE'),
+                    'real': _io_pool.submit(get_firebase_service().count_user_verifications, uid, verdict='REAL'),
+                    'week': _io_pool.submit(get_firebase_service().count_user_verifications, uid, since=week_ago_ts),
+                    'avg_score': _io_pool.submit(get_firebase_service().average_user_credibility_score, uid)
+                }
+                for content_type in TYPE_CODES:
+                    count_futures[content_type] = _io_pool.submit(
+                        get_firebase_service().count_user_verifications, uid, input_type=content_type
+                    )
+                counts = {label: future.result() for label, future in count_futures.items()}
+
+                if counts['total']:
+                    total = counts['total']
+                    user_stats['total_news_verifications'] = total
+
+                    for content_type in TYPE_CODES:
+                        content_stats[content_type] = counts[content_type] or 0
+
+                    fake_count = counts['fake'] or 0
+                    user_stats['fake_detected'] = fake_count
+                    user_stats['fake_percentage'] = round((fake_count / total) * 100, 1)
+
+                    verified_count = counts['real'] or 0
+                    user_stats['verified_news'] = verified_count
+                    user_stats['verified_percentage'] = round((verified_count / total) * 100, 1)
+
+                    user_stats['avg_score'] = round(counts['avg_score'] or 0.0, 1)
+                    user_stats['news_verifications_this_week'] = counts['week'] or 0
+
+                # Aggregation unavailable: reduce the fetched history locally
+                elif counts['total'] is None and user_news_verifications:
+                    total = len(user_news_verifications)
+                    user_stats['total_news_verifications'] = total
+                    verdict_codes = np.empty(total, dtype=np.int8)
+                    type_codes = np.empty(total, dtype=np.int8)
+                    scores = np.empty(total, dtype=np.float32)
+                    created_ts = np.empty(total, dtype=np.float64)
+
+                    for i, verification in enumerate(user_news_verifications):
+                        verdict_codes[i] = VERDICT_CODES.get(verification.get('verdict', ''), -1)
+                        type_codes[i] = TYPE_CODES.get(verification.get('input_type', 'text'), -1)
+                        scores[i] = verification.get('credibility_score', 0)
+                        # Prefer the numeric created_at_ts written at save
+                        # time; fall back to parsing the ISO string for
+                        # verifications saved before it existed
+                        created_at_ts = verification.get('created_at_ts')
+                        if created_at_ts is None:
+                            created_at_ts = datetime.fromisoformat(
+                                verification.get('created_at', '').replace('Z', '+00:00')
+                            ).timestamp()
+                        created_ts[i] = created_at_ts
+
+                    fake_count, verified_count, score_sum, week_count, type_counts = \
+                        reduce_user_stats(verdict_codes, type_codes, scores, created_ts, week_ago_ts)
+
                     # Count by type
-                    for verification in user_news_verifications:
-                        content_stats[verification.get('input_type', 'text')] += 1
-                    
-                    # Calculate other stats
-                    fake_count = sum(1 for v in user_news_verifications if v.get('verdict') == 'FAKE')
+                    for content_type, code in TYPE_CODES.items():
+                        content_stats[content_type] = int(type_counts[code])
+
                     user_stats['fake_detected'] = fake_count
-                    user_stats['fake_percentage'] = round((fake_count / len(user_news_verifications)) * 100, 1)
-                    
-                    verified_count = sum(1 for v in user_news_verifications if v.get('verdict') == 'REAL')
+                    user_stats['fake_percentage'] = round((fake_count / total) * 100, 1)
+
                     user_stats['verified_news'] = verified_count
-                    user_stats['verified_percentage'] = round((verified_count / len(user_news_verifications)) * 100, 1)
-                    
+                    user_stats['verified_percentage'] = round((verified_count / total) * 100, 1)
+
                     # Average credibility score
-                    scores = [v.get('credibility_score', 0) for v in user_news_verifications]
-                    user_stats['avg_score'] = round(sum(scores) / len(scores), 1) if scores else 0
-                    
+                    user_stats['avg_score'] = round(score_sum / total, 1)
+
                     # News verifications this week
-                    week_ago = datetime.utcnow() - timedelta(days=7)
-                    user_stats['news_verifications_this_week'] = sum(
-                        1 for v in user_news_verifications 
-                        if datetime.fromisoformat(v.get('created_at', '').replace('Z', '+00:00')) > week_ago
-                    )
+                    user_stats['news_verifications_this_week'] = week_count
                     
             except Exception as e:
                 logger.error(f"Error getting user statistics: {str(e)}")
@@ -246,76 +544,75 @@ def user_dashboard():
 @app.route('/api/analyze', methods=['POST'])
 def api_analyze():
     """API endpoint for news analysis"""
+    analysis_engine = get_analysis_engine()
     try:
         if not analysis_engine:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Analysis engine not available'
-            }), 503
+            }, 503)
         
         data = request.get_json()
         if not data:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'No data provided'
-            }), 400
+            }, 400)
         
         input_type = data.get('type')
         content = data.get('content', '').strip()
         
         if not content:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Content cannot be empty'
-            }), 400
+            }, 400)
         
         if not input_type or input_type not in ['text', 'url', 'facebook']:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Invalid input type'
-            }), 400
+            }, 400)
         
         # Get current user for saving results
         current_user = get_current_user()
         user_id = current_user['uid'] if current_user else None
-        
-        # Perform analysis
+
+        # Run the analysis synchronously: results must be shareable across
+        # gunicorn workers, and an in-process job table isn't. The pipeline
+        # itself already overlaps its slow steps internally.
         result = analysis_engine.analyze_news(
-            content=content,
+            content,
             input_type=input_type,
             user_id=user_id
         )
-        
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'analysis_id': result.get('analysis_id'),
-                'verdict': result['verdict'],
-                'credibility_score': result['credibility_score'],
-                'confidence': result['confidence'],
-                'explanation': result['explanation'],
-                'ml_prediction': result.get('ml_prediction', {}),
-                'fact_check_results': result.get('fact_check_results', []),
-                'poser_detection': result.get('poser_detection', {}),
-                'source_credibility': result.get('source_credibility', {}),
-                'processing_time': result.get('processing_time', 0)
-            })
-        else:
-            return jsonify({
+
+        # The engine reports failures in-band via _create_error_result;
+        # surface those as errors so the frontend shows its alert instead
+        # of rendering a partial results card
+        if result.get('error'):
+            return ojson({
                 'success': False,
-                'error': result.get('error', 'Analysis failed')
-            }), 500
-            
+                'error': result['error']
+            }, 500)
+
+        return ojson({
+            'success': True,
+            'analysis_id': result.get('analysis_id'),
+            'analysis': result
+        })
+
     except Exception as e:
         logger.error(f"Error in analyze API: {str(e)}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'Internal server error during analysis'
-        }), 500
+        }, 500)
 
 @app.route('/trends')
 def trends():
     """Misinformation trends page"""
+    analysis_engine = get_analysis_engine()
     current_user = get_current_user()
     
     # Get trends data
@@ -329,15 +626,17 @@ def trends():
     }
     
     if analysis_engine:
-        try:
-            # Get various trend metrics
-            trends_data['detection_rate'] = firebase_service.get_detection_rate_trends(days=30)
-            trends_data['category_distribution'] = firebase_service.get_category_distribution()
-            trends_data['trending_keywords'] = firebase_service.get_trending_keywords(limit=10)
-            trends_data['fake_news_patterns'] = firebase_service.get_fake_news_patterns(limit=5)
-            trends_data['high_risk_sources'] = firebase_service.get_high_risk_sources(limit=10)
-        except Exception as e:
-            logger.error(f"Error getting trends data: {str(e)}")
+        # Get various trend metrics concurrently (independent network calls)
+        results = fetch_firebase_parallel({
+            'detection_rate': ('get_detection_rate_trends', {'days': 30}),
+            'category_distribution': ('get_category_distribution', {}),
+            'trending_keywords': ('get_trending_keywords', {'limit': 10}),
+            'fake_news_patterns': ('get_fake_news_patterns', {'limit': 5}),
+            'high_risk_sources': ('get_high_risk_sources', {'limit': 10})
+        })
+        for key, value in results.items():
+            if value is not None:
+                trends_data[key] = value
     
     return render_template('trends.html',
                          current_user=current_user,
@@ -346,36 +645,30 @@ def trends():
 @app.route('/api/trends')
 def api_trends():
     """API endpoint for trends data"""
+    analysis_engine = get_analysis_engine()
     try:
         time_range = request.args.get('range', '7')  # days
         
         if not analysis_engine:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Service not available'
-            }), 503
+            }, 503)
         
-        trends_data = {
-            'total_news_verifications': firebase_service.get_total_news_verifications(days=int(time_range)),
-            'fake_detected': firebase_service.get_fake_detected(days=int(time_range)),
-            'accuracy_rate': firebase_service.get_accuracy_rate(days=int(time_range)),
-            'posers_detected': firebase_service.get_posers_detected(days=int(time_range)),
-            'detection_rate_chart': firebase_service.get_detection_rate_trends(days=int(time_range)),
-            'category_chart': firebase_service.get_category_distribution(days=int(time_range)),
-            'source_credibility_chart': firebase_service.get_source_credibility_trends(days=int(time_range))
-        }
+        # One bundled Firestore read covers every metric in the payload
+        trends_data = cached_firebase_call('get_trends_bundle', days=int(time_range))
         
-        return jsonify({
+        return ojson({
             'success': True,
             'data': trends_data
         })
         
     except Exception as e:
         logger.error(f"Error in trends API: {str(e)}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'Failed to fetch trends data'
-        }), 500
+        }, 500)
 
 @app.route('/api/auth/google', methods=['POST'])
 def google_auth():
@@ -385,13 +678,15 @@ def google_auth():
         id_token = data.get('idToken')
         
         if not id_token:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'No ID token provided'
-            }), 400
+            }, 400)
         
-        # Verify token with Firebase
-        user_info = firebase_service.verify_user_token(id_token)
+        # Verify token with Firebase (cached for repeat verifications)
+        # verify_user_token caches verified payloads itself (exp-aware),
+        # so no second cache layer is needed here
+        user_info = get_firebase_service().verify_user_token(id_token)
         
         if user_info:
             # Create or update user profile
@@ -400,17 +695,20 @@ def google_auth():
                 'email': user_info['email'],
                 'display_name': user_info.get('name', ''),
                 'photo_url': user_info.get('picture', ''),
-                'last_login': datetime.utcnow().isoformat(),
-                'created_at': datetime.utcnow().isoformat()
+                'last_login': g.now_iso,
+                'created_at': g.now_iso
             }
             
-            firebase_service.create_or_update_user_profile(user_info['uid'], user_profile)
+            get_firebase_service().create_or_update_user_profile(user_info['uid'], user_profile)
             
-            # Set session
+            # Set session, stashing the profile so get_current_user can
+            # skip the Firestore read until the refresh window elapses
             session['user_id'] = user_info['uid']
             session['user_email'] = user_info['email']
+            session['profile'] = user_profile
+            session['profile_at'] = time.time()
             
-            return jsonify({
+            return ojson({
                 'success': True,
                 'user': {
                     'uid': user_info['uid'],
@@ -420,17 +718,17 @@ def google_auth():
                 }
             })
         else:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Invalid token'
-            }), 401
+            }, 401)
             
     except Exception as e:
         logger.error(f"Error in Google auth: {str(e)}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'Authentication failed'
-        }), 500
+        }, 500)
 
 @app.route('/logout')
 def logout():
@@ -443,64 +741,77 @@ def logout():
 @login_required
 def get_analysis(analysis_id):
     """Get specific analysis details"""
+    analysis_engine = get_analysis_engine()
     try:
         current_user = get_current_user()
         if not current_user or not analysis_engine:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Unauthorized or service unavailable'
-            }), 401
-        
+            }, 401)
+
         analysis = analysis_engine.get_analysis_result(analysis_id)
-        
+
         if analysis and analysis.get('user_id') == current_user['uid']:
-            return jsonify({
+            return ojson({
                 'success': True,
                 'analysis': analysis
             })
         else:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Analysis not found'
-            }), 404
+            }, 404)
             
     except Exception as e:
         logger.error(f"Error getting analysis: {str(e)}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'Failed to retrieve analysis'
-        }), 500
+        }, 500)
 
 @app.route('/api/user/export')
 @login_required
 def export_user_data():
     """Export user data"""
+    analysis_engine = get_analysis_engine()
     try:
         current_user = get_current_user()
         if not current_user or not analysis_engine:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Unauthorized or service unavailable'
-            }), 401
-        
-        # Get all user data
-        user_data = {
-            'profile': current_user,
-            'news_verifications': analysis_engine.get_user_analysis_history(current_user['uid']),
-            'exported_at': datetime.utcnow().isoformat()
-        }
+            }, 401)
         
-        return jsonify({
-            'success': True,
-            'data': user_data
-        })
+        # Stream the export as NDJSON: profile first, then one verification
+        # per line as they arrive from Firestore, so large histories never
+        # get materialized in worker memory
+        def generate():
+            yield orjson.dumps({
+                'profile': current_user,
+                'exported_at': g.now_iso
+            }, default=str) + b'\n'
+
+            for verification in analysis_engine.iter_user_analysis_history(current_user['uid']):
+                yield orjson.dumps(verification, default=str) + b'\n'
+
+        # Content-Disposition lets the frontend hand the streamed body
+        # straight to a file download instead of parsing it
+        return app.response_class(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={
+                'Content-Disposition':
+                    f'attachment; filename=credinews-data-{g.now:%Y-%m-%d}.ndjson'
+            }
+        )
         
     except Exception as e:
         logger.error(f"Error exporting user data: {str(e)}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'Failed to export data'
-        }), 500
+        }, 500)
 
 # Health check endpoint
 @app.route('/health')
@@ -508,16 +819,16 @@ def health_check():
     """Health check endpoint"""
     status = {
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': g.now_iso,
         'services': {
-            'analysis_engine': analysis_engine is not None,
-            'firebase': firebase_service is not None,
-            'facebook': facebook_service is not None,
-            'factcheck': factcheck_service is not None
+            'analysis_engine': _service_available(get_analysis_engine),
+            'firebase': _service_available(get_firebase_service),
+            'facebook': _service_available(get_facebook_service),
+            'factcheck': _service_available(get_factcheck_service)
         }
     }
     
-    return jsonify(status)
+    return ojson(status)
 
 if __name__ == '__main__':
     # Set up logging for production
@@ -538,6 +849,10 @@ if __name__ == '__main__':
         app.logger.setLevel(logging.INFO)
         app.logger.info('CrediNews startup')
     
-    # Run the application
+    # Run the application (development only -- production runs under
+    # gunicorn via wsgi.py, see gunicorn.conf.py). threaded=True lets the
+    # dev server overlap the Firebase/fact-check network I/O the same way
+    # the gthread workers do in production.
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    debug_mode = os.environ.get('FLASK_DEBUG', '0') == '1'
+    app.run(host='0.0.0.0', port=port, debug=debug_mode, threaded=True)
\ No newline at end of file
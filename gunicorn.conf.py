@@ -0,0 +1,38 @@
+import multiprocessing
+import os
+
+# Threaded workers overlap the Firebase/fact-check network I/O that
+# dominates most request handlers
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+
+# Load the app (and the ML models it pulls in) once in the master process so
+# the sklearn pipelines are copy-on-write shared across workers instead of
+# duplicated per worker. Model arrays are memory-mapped read-only on load,
+# which keeps those pages clean and shared for the life of the process.
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # The master's log-listener thread doesn't survive the fork; restart
+    # it here or worker log records queue up unwritten
+    try:
+        import app as app_module
+        app_module._log_listener = None
+        app_module.start_log_listener()
+    except Exception as e:
+        server.log.warning("Log listener restart failed: %s", e)
+    
+    # Warm the Jinja bytecode cache so the first request a worker serves
+    # doesn't pay template compilation
+    try:
+        from app import app
+        for name in ('base.html', 'dashboard.html', 'trends.html', 'user_dashboard.html'):
+            app.jinja_env.get_template(name)
+    except Exception as e:
+        server.log.warning("Template warm-up failed: %s", e)
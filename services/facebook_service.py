@@ -1,11 +1,39 @@
+import logging
+import orjson
+import pandas as pd
+import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from datetime import datetime, timedelta
 import os
 from typing import Dict, List, Optional
 
+logger = logging.getLogger(__name__)
+
+# Single compiled pass over the post text instead of one substring scan per
+# keyword; word boundaries also stop matches inside longer tokens (URLs etc.)
+_NEWS_RE = re.compile(
+    r'\b(?:breaking|news|report|update|alert|announcement|'
+    r'confirmed|official|statement|press release)\b',
+    re.IGNORECASE
+)
+
+# Shared sentinel for missing-subtree lookups: no temporary dict is
+# allocated when a post has no reactions/comments/shares
+_EMPTY = {}
+
+def _engagement_counts(post):
+    """Extract (reactions, comments, shares) counts without allocating"""
+    reactions = ((post.get('reactions') or _EMPTY).get('summary') or _EMPTY).get('total_count', 0)
+    comments = ((post.get('comments') or _EMPTY).get('summary') or _EMPTY).get('total_count', 0)
+    shares = (post.get('shares') or _EMPTY).get('count', 0)
+    return reactions, comments, shares
+
 class FacebookService:
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.access_token = os.getenv('FACEBOOK_ACCESS_TOKEN')
         self.app_id = os.getenv('FACEBOOK_APP_ID')
         self.app_secret = os.getenv('FACEBOOK_APP_SECRET')
@@ -13,6 +41,21 @@ class FacebookService:
         
         if not self.access_token:
             raise ValueError("Facebook access token not found in environment variables")
+        
+        # Reuse one pooled session for all Graph API calls so TLS handshakes
+        # are paid once per connection instead of once per request; callers
+        # may inject an already-pooled session shared across services
+        if session is not None:
+            self.session = session
+        else:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=20,
+                pool_maxsize=50,
+                max_retries=Retry(total=2, backoff_factor=0.1)
+            )
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
     
     def get_page_posts(self, page_id: str, limit: int = 50) -> Dict:
         """Get posts from a Facebook page"""
@@ -24,13 +67,13 @@ class FacebookService:
                 'limit': limit
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             
-            return response.json()
+            return orjson.loads(response.content)
             
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching page posts: {e}")
+            logger.error("Error fetching page posts: %s", e)
             return {'data': [], 'error': str(e)}
     
     def get_post_details(self, post_id: str) -> Dict:
@@ -42,13 +85,13 @@ class FacebookService:
                 'fields': 'id,message,story,created_time,updated_time,type,link,name,description,caption,picture,full_picture,shares,reactions.summary(true),comments.summary(true),from'
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             
-            return response.json()
+            return orjson.loads(response.content)
             
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching post details: {e}")
+            logger.error("Error fetching post details: %s", e)
             return {'error': str(e)}
     
     def get_page_info(self, page_id: str) -> Dict:
@@ -60,13 +103,13 @@ class FacebookService:
                 'fields': 'id,name,username,about,category,created_time,fan_count,followers_count,verification_status,is_verified,website,location'
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             
-            return response.json()
+            return orjson.loads(response.content)
             
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching page info: {e}")
+            logger.error("Error fetching page info: %s", e)
             return {'error': str(e)}
     
     def search_posts(self, query: str, limit: int = 25) -> Dict:
@@ -81,51 +124,64 @@ class FacebookService:
                 'limit': limit
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             
-            return response.json()
+            return orjson.loads(response.content)
             
         except requests.exceptions.RequestException as e:
-            print(f"Error searching posts: {e}")
+            logger.error("Error searching posts: %s", e)
             return {'data': [], 'error': str(e)}
     
     def analyze_account_activity(self, page_id: str) -> Dict:
         """Analyze account activity for poser detection"""
         try:
-            # Get page info
-            page_info = self.get_page_info(page_id)
+            # One batched Graph API request for both page info and posts:
+            # a single round trip instead of two
+            batch = self.batch_request([
+                {'method': 'GET',
+                 'relative_url': f"{page_id}?fields=id,name,username,about,category,created_time,fan_count,followers_count,verification_status,is_verified,website,location"},
+                {'method': 'GET',
+                 'relative_url': f"{page_id}/posts?limit=100&fields=id,message,story,created_time,updated_time,type,link,name,description,caption,picture,full_picture,shares,reactions.summary(true),comments.summary(true)"}
+            ])
+            if 'error' in batch:
+                # Batch endpoint unavailable: fall back to concurrent calls
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    info_future = pool.submit(self.get_page_info, page_id)
+                    posts_future = pool.submit(self.get_page_posts, page_id, 100)
+                    page_info = info_future.result()
+                    posts_data = posts_future.result()
+            else:
+                page_info, posts_data = batch
+            
             if 'error' in page_info:
                 return page_info
             
-            # Get recent posts
-            posts_data = self.get_page_posts(page_id, limit=100)
             if 'error' in posts_data:
                 return posts_data
             
             posts = posts_data.get('data', [])
             
-            # Calculate activity metrics
+            # Calculate activity metrics with vectorized pandas ops: one
+            # batched to_datetime parse and C-level reductions instead of
+            # per-post strptime calls and dict walks
             now = datetime.now()
-            recent_posts = []
+            recent_count = 0
             total_engagement = 0
             
-            for post in posts:
-                created_time = datetime.strptime(post['created_time'], '%Y-%m-%dT%H:%M:%S%z')
-                days_ago = (now - created_time.replace(tzinfo=None)).days
-                
-                if days_ago <= 30:  # Posts from last 30 days
-                    recent_posts.append(post)
+            if posts:
+                df = pd.DataFrame(posts)
+                created = pd.to_datetime(
+                    df['created_time'], format='%Y-%m-%dT%H:%M:%S%z', utc=True
+                ).dt.tz_localize(None)
+                recent_count = int(((pd.Timestamp(now) - created).dt.days <= 30).sum())
                 
-                # Calculate engagement
-                reactions = post.get('reactions', {}).get('summary', {}).get('total_count', 0)
-                comments = post.get('comments', {}).get('summary', {}).get('total_count', 0)
-                shares = post.get('shares', {}).get('count', 0)
-                
-                total_engagement += reactions + comments + shares
+                total_engagement = sum(
+                    sum(_engagement_counts(post)) for post in posts
+                )
             
             # Calculate metrics
-            posting_frequency = len(recent_posts) / 30 if recent_posts else 0
+            posting_frequency = recent_count / 30 if recent_count else 0
             avg_engagement = total_engagement / len(posts) if posts else 0
             
             # Determine suspicion level
@@ -180,7 +236,7 @@ class FacebookService:
                 'page_info': page_info,
                 'activity_metrics': {
                     'total_posts': len(posts),
-                    'recent_posts_30d': len(recent_posts),
+                    'recent_posts_30d': recent_count,
                     'posting_frequency_per_day': round(posting_frequency, 2),
                     'average_engagement': round(avg_engagement, 2),
                     'follower_count': follower_count,
@@ -195,7 +251,7 @@ class FacebookService:
             }
             
         except Exception as e:
-            print(f"Error analyzing account activity: {e}")
+            logger.error("Error analyzing account activity: %s", e)
             return {'error': str(e)}
     
     def extract_news_content(self, posts: List[Dict]) -> List[Dict]:
@@ -211,25 +267,23 @@ class FacebookService:
                 continue
             
             # Check if post contains news-like content
-            news_keywords = ['breaking', 'news', 'report', 'update', 'alert', 'announcement', 
-                           'confirmed', 'official', 'statement', 'press release']
-            
-            content_lower = content.lower()
-            has_news_keywords = any(keyword in content_lower for keyword in news_keywords)
+            has_news_keywords = _NEWS_RE.search(content) is not None
             
             # Extract structured data
+            reactions, comments, shares = _engagement_counts(post)
+            source = post.get('from') or _EMPTY
             news_item = {
                 'post_id': post.get('id'),
                 'content': content,
                 'link': post.get('link'),
                 'created_time': post.get('created_time'),
                 'post_type': post.get('type'),
-                'source_page': post.get('from', {}).get('name', 'Unknown'),
-                'source_page_id': post.get('from', {}).get('id'),
+                'source_page': source.get('name', 'Unknown'),
+                'source_page_id': source.get('id'),
                 'engagement': {
-                    'reactions': post.get('reactions', {}).get('summary', {}).get('total_count', 0),
-                    'comments': post.get('comments', {}).get('summary', {}).get('total_count', 0),
-                    'shares': post.get('shares', {}).get('count', 0)
+                    'reactions': reactions,
+                    'comments': comments,
+                    'shares': shares
                 },
                 'has_news_keywords': has_news_keywords,
                 'media': {
@@ -242,13 +296,57 @@ class FacebookService:
         
         return news_items
     
+    def get_objects_bulk(self, ids: List[str], fields: str) -> Dict:
+        """Fetch several Graph API objects in one request via ?ids="""
+        try:
+            params = {
+                'access_token': self.access_token,
+                'ids': ','.join(ids),
+                'fields': fields
+            }
+            
+            response = self.session.get(self.base_url, params=params)
+            response.raise_for_status()
+            
+            return orjson.loads(response.content)
+            
+        except requests.exceptions.RequestException as e:
+            logger.error("Error fetching objects in bulk: %s", e)
+            return {'error': str(e)}
+    
+    def batch_request(self, requests_spec: List[Dict]) -> List[Dict]:
+        """Run up to 50 Graph API sub-requests in one HTTP round trip.
+        
+        Each spec is {'method': ..., 'relative_url': ...}; returns the parsed
+        body of each sub-response in order, or {'error': ...} on failure.
+        """
+        try:
+            response = self.session.post(self.base_url, data={
+                'access_token': self.access_token,
+                'batch': json.dumps(requests_spec),
+                'include_headers': 'false'
+            })
+            response.raise_for_status()
+            
+            results = []
+            for sub_response in orjson.loads(response.content):
+                if sub_response and sub_response.get('code') == 200:
+                    results.append(orjson.loads(sub_response['body']))
+                else:
+                    results.append({'error': f"Batch sub-request failed: {sub_response}"})
+            return results
+            
+        except requests.exceptions.RequestException as e:
+            logger.error("Error running batch request: %s", e)
+            return {'error': str(e)}
+    
     def validate_access_token(self) -> bool:
         """Validate if the access token is still valid"""
         try:
             url = f"{self.base_url}/me"
             params = {'access_token': self.access_token}
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             return response.status_code == 200
             
         except:
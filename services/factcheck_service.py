@@ -1,19 +1,202 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from functools import lru_cache
+import numpy as np
 import requests
+from cachetools import TTLCache
+from utils.stats_kernels import njit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 from typing import Dict, List, Optional
 from urllib.parse import quote
-from datetime import datetime
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Credibility verdict bucketing: scores fall into one of five bands via a
+# single sorted-threshold lookup instead of a five-way branch chain
+_VERDICT_THRESHOLDS = np.array([0.2, 0.4, 0.6, 0.8])
+_VERDICT_LABELS = ('Likely False', 'Leaning False', 'Mixed/Uncertain',
+                   'Leaning True', 'Likely True')
+
+# Normalized rating table (score from 0.0 to 1.0, where 1.0 is completely
+# true), built once at import instead of per _normalize_rating call
+_RATING_MAP = {
+    # True ratings
+    'true': {'score': 1.0, 'label': 'True', 'confidence': 0.9},
+    'correct': {'score': 1.0, 'label': 'True', 'confidence': 0.9},
+    'accurate': {'score': 1.0, 'label': 'True', 'confidence': 0.9},
+    'verified': {'score': 1.0, 'label': 'True', 'confidence': 0.9},
+    
+    # Mostly true
+    'mostly true': {'score': 0.8, 'label': 'Mostly True', 'confidence': 0.8},
+    'mostly correct': {'score': 0.8, 'label': 'Mostly True', 'confidence': 0.8},
+    'largely accurate': {'score': 0.8, 'label': 'Mostly True', 'confidence': 0.8},
+    
+    # Mixed/Partially true
+    'mixture': {'score': 0.5, 'label': 'Mixed', 'confidence': 0.7},
+    'half true': {'score': 0.5, 'label': 'Mixed', 'confidence': 0.7},
+    'partially true': {'score': 0.5, 'label': 'Mixed', 'confidence': 0.7},
+    'some truth': {'score': 0.5, 'label': 'Mixed', 'confidence': 0.7},
+    
+    # Mostly false
+    'mostly false': {'score': 0.2, 'label': 'Mostly False', 'confidence': 0.8},
+    'mostly incorrect': {'score': 0.2, 'label': 'Mostly False', 'confidence': 0.8},
+    'largely inaccurate': {'score': 0.2, 'label': 'Mostly False', 'confidence': 0.8},
+    
+    # False ratings
+    'false': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
+    'incorrect': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
+    'inaccurate': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
+    'debunked': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
+    'fake': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
+    'hoax': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
+    
+    # Unverifiable
+    'unverifiable': {'score': 0.3, 'label': 'Unverifiable', 'confidence': 0.6},
+    'unproven': {'score': 0.3, 'label': 'Unverifiable', 'confidence': 0.6},
+    'no evidence': {'score': 0.3, 'label': 'Unverifiable', 'confidence': 0.6},
+    
+    # Satire/Opinion
+    'satire': {'score': 0.1, 'label': 'Satire', 'confidence': 0.8},
+    'opinion': {'score': 0.4, 'label': 'Opinion', 'confidence': 0.7},
+    'commentary': {'score': 0.4, 'label': 'Opinion', 'confidence': 0.7}
+}
+
+# Partial matches ("rated false by...") are resolved with one linear pass
+# over the rating text instead of a substring probe per table key
+try:
+    import ahocorasick
+    _RATING_AC = ahocorasick.Automaton()
+    for _key, _value in _RATING_MAP.items():
+        _RATING_AC.add_word(_key, (_key, _value))
+    _RATING_AC.make_automaton()
+
+    def _match_rating_substring(rating_lower):
+        hit = next(_RATING_AC.iter(rating_lower), None)
+        return hit[1][1] if hit else None
+except ImportError:
+    import re as _re
+    _RATING_RE = _re.compile('|'.join(
+        _re.escape(key) for key in sorted(_RATING_MAP, key=len, reverse=True)
+    ))
+
+    def _match_rating_substring(rating_lower):
+        match = _RATING_RE.search(rating_lower)
+        return _RATING_MAP[match.group(0)] if match else None
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _credibility_kernel(scores, weights):
+    """Weighted mean and variance of rating scores in one compiled pass"""
+    weighted_sum = 0.0
+    total_weight = 0.0
+    for i in range(scores.shape[0]):
+        weighted_sum += scores[i] * weights[i]
+        total_weight += weights[i]
+    mean = weighted_sum / total_weight if total_weight > 0 else 0.5
+    
+    variance = 0.0
+    for i in range(scores.shape[0]):
+        diff = scores[i] - mean
+        variance += diff * diff
+    variance /= scores.shape[0]
+    return mean, variance
+
+@lru_cache(maxsize=4096)
+def _match_rating(rating_lower):
+    """Resolve a lowercased rating to (score, label, confidence), or None"""
+    rating = _RATING_MAP.get(rating_lower) or _match_rating_substring(rating_lower)
+    if rating is None:
+        return None
+    return rating['score'], rating['label'], rating['confidence']
 
 class FactCheckService:
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.api_key = os.getenv('GOOGLE_FACTCHECK_API_KEY')
         self.base_url = 'https://factchecktools.googleapis.com/v1alpha1/claims:search'
         
         if not self.api_key:
-            print("Warning: Google Fact Check API key not found. Fact checking will be limited.")
+            logger.warning("Google Fact Check API key not found. Fact checking will be limited.")
+        
+        # Duplicate and re-shared claims dominate traffic, so completed
+        # searches are served from memory for a few hours; error responses
+        # are never cached
+        self._search_cache = TTLCache(maxsize=1024, ttl=21600)
+        self._search_cache_lock = threading.Lock()
+        
+        # Static params (key, pageSize, languageCode) are baked into one
+        # prebuilt URL per language so each search only encodes the query
+        self._language_urls = {}
+        
+        # Circuit breaker: after several consecutive failures the API is
+        # assumed down and searches fast-fail for a cool-off window instead
+        # of stalling request threads on full socket timeouts
+        self._breaker_fail_max = 5
+        self._breaker_reset_timeout = 30
+        self._breaker_failures = 0
+        self._breaker_opened_at = 0.0
+        self._breaker_lock = threading.Lock()
+        
+        # Reuse one pooled session so repeated fact-check searches share warm
+        # TLS connections to the Google API instead of handshaking each time;
+        # an injected session lets services share one connection pool
+        if session is not None:
+            self.session = session
+            return
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET'],
+                respect_retry_after_header=True
+            )
+        )
+        self.session.mount('https://', adapter)
     
-    def search_fact_checks(self, query: str, language_code: str = 'en') -> Dict:
-        """Search for fact checks related to a query"""
+    def _url_for(self, language_code: str) -> str:
+        """Return the search URL with static params pre-encoded for a language"""
+        url = self._language_urls.get(language_code)
+        if url is None:
+            url = (f'{self.base_url}?key={quote(self.api_key, safe="")}'
+                   f'&pageSize=10&languageCode={quote(language_code, safe="")}')
+            self._language_urls[language_code] = url
+        return url
+    
+    def _breaker_is_open(self) -> bool:
+        """True while the breaker is open; half-opens after the cool-off"""
+        with self._breaker_lock:
+            if self._breaker_failures < self._breaker_fail_max:
+                return False
+            if time.time() - self._breaker_opened_at >= self._breaker_reset_timeout:
+                # Half-open: let the next call probe the API
+                self._breaker_failures = self._breaker_fail_max - 1
+                return False
+            return True
+    
+    def _breaker_record(self, success: bool):
+        with self._breaker_lock:
+            if success:
+                self._breaker_failures = 0
+            else:
+                self._breaker_failures += 1
+                if self._breaker_failures == self._breaker_fail_max:
+                    self._breaker_opened_at = time.time()
+    
+    def search_fact_checks(self, query: str, language_code: str = 'en',
+                           no_cache: bool = False) -> Dict:
+        """Search for fact checks related to a query.
+
+        Results are cached per normalized (query, language) for the TTL
+        window; pass no_cache=True to always hit the API.
+        """
         if not self.api_key:
             return {
                 'claims': [],
@@ -21,18 +204,26 @@ class FactCheckService:
                 'source': 'google_factcheck'
             }
         
-        try:
-            params = {
-                'key': self.api_key,
-                'query': query,
-                'languageCode': language_code,
-                'pageSize': 10
+        cache_key = (' '.join(query.lower().split()), language_code)
+        if not no_cache:
+            with self._search_cache_lock:
+                cached = self._search_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if self._breaker_is_open():
+            return {
+                'claims': [],
+                'error': 'circuit_open',
+                'source': 'google_factcheck'
             }
-            
-            response = requests.get(self.base_url, params=params)
+        
+        try:
+            response = self.session.get(self._url_for(language_code),
+                                        params={'query': query}, timeout=(3.05, 10))
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Process and structure the response
             claims = data.get('claims', [])
@@ -42,15 +233,23 @@ class FactCheckService:
                 processed_claim = self._process_claim(claim)
                 processed_claims.append(processed_claim)
             
-            return {
+            result = {
                 'claims': processed_claims,
                 'total_results': len(processed_claims),
                 'source': 'google_factcheck',
                 'query': query
             }
             
+            if not no_cache:
+                with self._search_cache_lock:
+                    self._search_cache[cache_key] = result
+            
+            self._breaker_record(success=True)
+            return result
+            
         except requests.exceptions.RequestException as e:
-            print(f"Error searching fact checks: {e}")
+            self._breaker_record(success=False)
+            logger.error("Error searching fact checks: %s", e)
             return {
                 'claims': [],
                 'error': str(e),
@@ -97,59 +296,15 @@ class FactCheckService:
         if not textual_rating:
             return {'score': 0.5, 'label': 'Unknown', 'confidence': 0.0}
         
-        rating_lower = textual_rating.lower()
-        
-        # Define rating mappings (score from 0.0 to 1.0, where 1.0 is completely true)
-        rating_mappings = {
-            # True ratings
-            'true': {'score': 1.0, 'label': 'True', 'confidence': 0.9},
-            'correct': {'score': 1.0, 'label': 'True', 'confidence': 0.9},
-            'accurate': {'score': 1.0, 'label': 'True', 'confidence': 0.9},
-            'verified': {'score': 1.0, 'label': 'True', 'confidence': 0.9},
-            
-            # Mostly true
-            'mostly true': {'score': 0.8, 'label': 'Mostly True', 'confidence': 0.8},
-            'mostly correct': {'score': 0.8, 'label': 'Mostly True', 'confidence': 0.8},
-            'largely accurate': {'score': 0.8, 'label': 'Mostly True', 'confidence': 0.8},
-            
-            # Mixed/Partially true
-            'mixture': {'score': 0.5, 'label': 'Mixed', 'confidence': 0.7},
-            'half true': {'score': 0.5, 'label': 'Mixed', 'confidence': 0.7},
-            'partially true': {'score': 0.5, 'label': 'Mixed', 'confidence': 0.7},
-            'some truth': {'score': 0.5, 'label': 'Mixed', 'confidence': 0.7},
-            
-            # Mostly false
-            'mostly false': {'score': 0.2, 'label': 'Mostly False', 'confidence': 0.8},
-            'mostly incorrect': {'score': 0.2, 'label': 'Mostly False', 'confidence': 0.8},
-            'largely inaccurate': {'score': 0.2, 'label': 'Mostly False', 'confidence': 0.8},
-            
-            # False ratings
-            'false': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
-            'incorrect': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
-            'inaccurate': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
-            'debunked': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
-            'fake': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
-            'hoax': {'score': 0.0, 'label': 'False', 'confidence': 0.9},
-            
-            # Unverifiable
-            'unverifiable': {'score': 0.3, 'label': 'Unverifiable', 'confidence': 0.6},
-            'unproven': {'score': 0.3, 'label': 'Unverifiable', 'confidence': 0.6},
-            'no evidence': {'score': 0.3, 'label': 'Unverifiable', 'confidence': 0.6},
-            
-            # Satire/Opinion
-            'satire': {'score': 0.1, 'label': 'Satire', 'confidence': 0.8},
-            'opinion': {'score': 0.4, 'label': 'Opinion', 'confidence': 0.7},
-            'commentary': {'score': 0.4, 'label': 'Opinion', 'confidence': 0.7}
-        }
-        
-        # Try exact match first
-        if rating_lower in rating_mappings:
-            return rating_mappings[rating_lower]
+        rating_lower = textual_rating.lower().strip()
         
-        # Try partial matches
-        for key, value in rating_mappings.items():
-            if key in rating_lower or rating_lower in key:
-                return value
+        # Ratings repeat heavily across claims, so matched lookups are
+        # memoized; unknown ratings stay uncached since their input set is
+        # unbounded
+        matched = _match_rating(rating_lower)
+        if matched is not None:
+            score, label, confidence = matched
+            return {'score': score, 'label': label, 'confidence': confidence}
         
         # Default for unknown ratings
         return {
@@ -171,16 +326,12 @@ class FactCheckService:
                 'source_diversity': 0
             }
         
-        # Collect all ratings
-        all_ratings = []
-        publishers = set()
-        
-        for claim in claims:
-            for review in claim.get('reviews', []):
-                rating = review.get('normalized_rating', {})
-                if rating.get('score') is not None:
-                    all_ratings.append(rating)
-                    publishers.add(review.get('publisher_name', ''))
+        # Collect all ratings in one flat pass
+        reviews = [review for claim in claims for review in claim.get('reviews', [])]
+        all_ratings = [review.get('normalized_rating', {}) for review in reviews
+                      if review.get('normalized_rating', {}).get('score') is not None]
+        publishers = {review.get('publisher_name', '') for review in reviews
+                     if review.get('normalized_rating', {}).get('score') is not None}
         
         if not all_ratings:
             return {
@@ -191,27 +342,24 @@ class FactCheckService:
                 'source_diversity': 0
             }
         
-        # Calculate weighted average score
-        total_weighted_score = 0
-        total_weight = 0
-        
-        for rating in all_ratings:
-            weight = rating.get('confidence', 0.5)
-            score = rating.get('score', 0.5)
-            total_weighted_score += score * weight
-            total_weight += weight
+        # Weighted average and agreement as C-level NumPy reductions rather
+        # than per-element Python loops
+        count = len(all_ratings)
+        scores = np.fromiter(
+            (r.get('score', 0.5) for r in all_ratings), dtype=np.float64, count=count)
+        weights = np.fromiter(
+            (r.get('confidence', 0.5) for r in all_ratings), dtype=np.float64, count=count)
         
-        overall_score = total_weighted_score / total_weight if total_weight > 0 else 0.5
+        overall_score, score_variance = _credibility_kernel(scores, weights)
+        overall_score = float(overall_score)
         
         # Calculate confidence based on number of sources and agreement
         source_diversity = len(publishers)
-        evidence_count = len(all_ratings)
+        evidence_count = count
         
         # Calculate agreement (how much ratings agree with each other)
-        scores = [r.get('score', 0.5) for r in all_ratings]
-        if len(scores) > 1:
-            score_variance = sum((s - overall_score) ** 2 for s in scores) / len(scores)
-            agreement = max(0, 1 - score_variance * 4)  # Scale variance to 0-1
+        if count > 1:
+            agreement = max(0, 1 - float(score_variance) * 4)  # Scale variance to 0-1
         else:
             agreement = 1.0
         
@@ -222,17 +370,9 @@ class FactCheckService:
             agreement * 0.3  # Higher agreement = higher confidence
         ))
         
-        # Determine verdict
-        if overall_score >= 0.8:
-            verdict = 'Likely True'
-        elif overall_score >= 0.6:
-            verdict = 'Leaning True'
-        elif overall_score >= 0.4:
-            verdict = 'Mixed/Uncertain'
-        elif overall_score >= 0.2:
-            verdict = 'Leaning False'
-        else:
-            verdict = 'Likely False'
+        # Determine verdict via the threshold table (>= semantics preserved
+        # by searchsorted's 'right' side)
+        verdict = _VERDICT_LABELS[int(np.searchsorted(_VERDICT_THRESHOLDS, overall_score, side='right'))]
         
         return {
             'overall_score': round(overall_score, 3),
@@ -244,6 +384,23 @@ class FactCheckService:
             'detailed_ratings': all_ratings
         }
     
+    def get_fact_check_summaries(self, queries: List[str],
+                                 language_code: str = 'en') -> List[Dict]:
+        """Fact-check several queries concurrently.
+
+        Fans the searches out over threads sharing the pooled session, so a
+        batch costs roughly the slowest round trip instead of their sum.
+        Results are returned in query order.
+        """
+        if not queries:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(queries))) as pool:
+            return list(pool.map(
+                lambda query: self.get_fact_check_summary(query, language_code),
+                queries
+            ))
+    
     def get_fact_check_summary(self, query: str, language_code: str = 'en') -> Dict:
         """Get a comprehensive fact check summary for a query"""
         # Search for fact checks
@@ -257,6 +414,6 @@ class FactCheckService:
             'query': query,
             'fact_check_results': claims_data,
             'credibility_analysis': credibility_analysis,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
             'api_status': 'success' if not claims_data.get('error') else 'error'
         }
\ No newline at end of file
@@ -733,22 +733,23 @@ class UserDashboardManager {
 
     async exportUserData() {
         try {
+            // The endpoint streams NDJSON; download the body as-is instead
+            // of parsing it (errors still arrive as a JSON object)
             const response = await fetch('/api/user/export');
-            const data = await response.json();
-
-            if (data.success) {
-                const blob = new Blob([JSON.stringify(data.data, null, 2)], {
-                    type: 'application/json'
-                });
-                const url = URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.href = url;
-                a.download = `credinews-data-${new Date().toISOString().split('T')[0]}.json`;
-                document.body.appendChild(a);
-                a.click();
-                document.body.removeChild(a);
-                URL.revokeObjectURL(url);
+            if (!response.ok) {
+                console.error('Error exporting data: HTTP', response.status);
+                return;
             }
+
+            const blob = await response.blob();
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `credinews-data-${new Date().toISOString().split('T')[0]}.ndjson`;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            URL.revokeObjectURL(url);
         } catch (error) {
             console.error('Error exporting data:', error);
         }
@@ -1702,6 +1702,9 @@ class TextPreprocessor:
             'cleaned_text': cleaned_text,
             'processed_text': processed_text,
             'tokens': tokens,
+            # Shared with downstream stages (keyword extraction) so they
+            # don't re-lowercase the full text; stripped before persistence
+            'lower_text': text_lower,
             'slang_detected': slang_detected,
             'sarcasm_analysis': sarcasm_analysis,
             'fake_indicators': fake_indicators,
@@ -0,0 +1,53 @@
+import numpy as np
+
+# Numba is optional: when it's missing the kernels below run as plain Python,
+# which keeps the app working in environments without a compiler toolchain.
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return decorator
+
+# Integer codes used to encode the string columns before handing them to the
+# compiled kernel (Numba works on numeric arrays, not Python strings)
+VERDICT_CODES = {'FAKE': 0, 'REAL': 1}
+TYPE_CODES = {'text': 0, 'url': 1, 'facebook': 2}
+
+
+@njit(cache=True)
+def reduce_user_stats(verdict_codes, type_codes, scores, created_ts, week_cutoff):
+    """Single-pass reduction over encoded verification columns.
+
+    Returns (fake_count, real_count, score_sum, week_count, type_counts)
+    where type_counts is indexed by TYPE_CODES.
+    """
+    fake_count = 0
+    real_count = 0
+    score_sum = 0.0
+    week_count = 0
+    type_counts = np.zeros(3, dtype=np.int64)
+
+    for i in range(verdict_codes.shape[0]):
+        verdict = verdict_codes[i]
+        if verdict == 0:
+            fake_count += 1
+        elif verdict == 1:
+            real_count += 1
+
+        content_type = type_codes[i]
+        if 0 <= content_type < 3:
+            type_counts[content_type] += 1
+
+        score_sum += scores[i]
+
+        if created_ts[i] > week_cutoff:
+            week_count += 1
+
+    return fake_count, real_count, score_sum, week_count, type_counts